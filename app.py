@@ -20,71 +20,174 @@ Features added:
 Usage:
 - CLI single file -> python app.py -i sample.md -o sample.html
 - CLI read stdin -> cat sample.md | python app.py --stdout
-- Batch directory -> python app.py -d md_dir -D html_dir
+- Batch directory -> python app.py -d md_dir -D html_dir (add --force to redo up-to-date files)
 - Run web form -> python app.py --serve (then open http://127.0.0.1:5000)
 
 Requires: Flask (only for web form). Install with: pip install flask
+Optional: cmarkgfm (C parser for the body, set MD2HTML_USE_CMARK=1). Install with: pip install cmarkgfm
 """
 
 from pathlib import Path
 import re
 import argparse
 import html
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Optional
 
 # Flask import (optional)
 try:
-    from flask import Flask, request, render_template_string
+    from flask import Flask, request
 except Exception:
     Flask = None
 
+# cmarkgfm import (optional): C parser for the body, opt in with MD2HTML_USE_CMARK=1
+try:
+    import cmarkgfm
+except ImportError:
+    cmarkgfm = None
+USE_CMARK = cmarkgfm is not None and os.environ.get("MD2HTML_USE_CMARK") == "1"
+
 
 # Inline regexes
-LINK_RE = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
-IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
-BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
-ITALIC_RE = re.compile(r"\*(.+?)\*")
-STRIKE_RE = re.compile(r"~~(.+?)~~")
+# italic or bold in one match; italic text may wrap a **bold** pair but no stray
+# "*". Italic is tried first so ***x*** nests as <em><strong>x</strong></em>;
+# its closer may not be the start of a **bold** pair. The bold branch has no
+# lookarounds so a miss costs one lazy scan per opener (linear overall)
+EMPH_RE = re.compile(
+    r"\*(?!\s)((?:[^*\n]|\*\*[^*\n]+?\*\*)+?)\*(?!\*[^*\n]+?\*\*)|\*\*(.+?)\*\*"
+)
+# Block-level regexes
 BLOCKQUOTE_RE = re.compile(r"^>\s?(.*)")
-INLINE_CODE_RE = re.compile(r"`([^`]+)`")
 HR_RE = re.compile(r"^\s*((?:-{3,})|(?:\*{3,})|(?:_{3,}))\s*$")
 TABLE_ROW_RE = re.compile(r"^\s*\|(.+)\|\s*$")
-# Block-level regexes
 UL_ITEM_RE = re.compile(r"^\s*[-+*]\s+(.*)")
 OL_ITEM_RE = re.compile(r"^\s*(\d+)[.)]\s+(.*)")
 HEADING_RE = re.compile(r"^(#{1,6})\s*(.*)")
 FENCE_RE = re.compile(r"^\s*```(.*)$")
+# rendered-HTML regexes (SEO extraction)
+TAG_RE = re.compile(r"<.*?>")
+# blockquote/li open or close tag, or a whole heading/paragraph element
+HTML_BLOCK_RE = re.compile(
+    r"<(/?)(?:blockquote|li)\b[^>]*>|<(p|h[1-6])\b[^>]*>(.*?)</\2>", re.S
+)
+# any line that starts a heading, list item or fence (ends a paragraph)
+PARA_TERM_RE = re.compile(r"^(?:#|\s*(?:[-+*]\s|\d+[.)]\s|```))")
 
 # Inline parsing
 def escape_html(text: str) -> str:
-    return html.escape(text, quote=False)
-
-# Inline parsing function
+    # same as html.escape(text, quote=False) without the keyword call;
+    # "&" must go first so the other entities are not escaped twice.
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+# Inline parsing helpers (single left-to-right scan, see inline_parse)
+def _find(text: str, sub: str, start: int, memo: dict) -> int:
+    # str.find with a per-call memo: a miss (or hit at r) from p also answers
+    # any later start in [p, r], so repeated openers don't rescan the line
+    hit = memo.get(sub)
+    if hit is not None and hit[0] <= start and (hit[1] == -1 or start <= hit[1]):
+        return hit[1]
+    r = text.find(sub, start)
+    memo[sub] = (start, r)
+    return r
+
+
+def _scan_image(text: str, i: int, memo: dict):
+    if not text.startswith("![", i):
+        return None
+    close = _find(text, "]", i + 2, memo)
+    if close == -1 or not text.startswith("(", close + 1):
+        return None
+    end = _find(text, ")", close + 2, memo)
+    if end <= close + 2:
+        return None
+    # text is already escaped by the caller
+    alt = text[i + 2 : close]
+    src = text[close + 2 : end]
+    return f'<img src="{src}" alt="{alt}" loading="lazy">', end + 1
+
+
+def _scan_link(text: str, i: int, memo: dict):
+    # a linked image ([![alt](src)](url)) has its own "]": skip past it
+    j = i + 1
+    img = _scan_image(text, j, memo)
+    if img is not None:
+        j = img[1]
+    close = _find(text, "]", j, memo)
+    if close <= i + 1 or not text.startswith("(", close + 1):
+        return None
+    end = _find(text, ")", close + 2, memo)
+    if end <= close + 2:
+        return None
+    t = inline_parse(text[i + 1 : close])
+    u = text[close + 2 : end]
+    return f'<a href="{u}">{t}</a>', end + 1
+
+
+def _scan_code(text: str, i: int, memo: dict):
+    end = _find(text, "`", i + 1, memo)
+    if end <= i + 1:
+        return None
+    return f"<code>{text[i + 1 : end]}</code>", end + 1
+
+
+def _emph(m):
+    if m.group(1) is not None:
+        return f"<em>{inline_parse(m.group(1))}</em>"
+    return f"<strong>{inline_parse(m.group(2))}</strong>"
+
+
+def _scan_emphasis(text: str, i: int, memo: dict):
+    m = EMPH_RE.match(text, i)
+    if not m:
+        return None
+    return _emph(m), m.end()
+
+
+def _scan_strike(text: str, i: int, memo: dict):
+    if not text.startswith("~~", i):
+        return None
+    end = _find(text, "~~", i + 3, memo)
+    if end == -1:
+        return None
+    return f"<del>{inline_parse(text[i + 2 : end])}</del>", end + 2
+
+
+_INLINE_SCANNERS = {
+    "!": _scan_image,
+    "[": _scan_link,
+    "`": _scan_code,
+    "*": _scan_emphasis,
+    "~": _scan_strike,
+}
+_INLINE_START_RE = re.compile(r"[!\[`*~]")
+
+# Inline parsing function (expects already escaped text)
 def inline_parse(text: str) -> str:
-    # images first
-    def _img(m):
-        alt = escape_html(m.group(1))
-        src = escape_html(m.group(2))
-        return f'<img src="{src}" alt="{alt}" loading="lazy">'
-
-    text = IMAGE_RE.sub(_img, text)
-
-    # links
-    def _link(m):
-        t = escape_html(m.group(1))
-        u = escape_html(m.group(2))
-        return f'<a href="{u}">{t}</a>'
-    
-    text = LINK_RE.sub(_link, text)
-    # inline code
-    text = INLINE_CODE_RE.sub(r"<code>\1</code>", text)
-    # bold then italic
-    text = BOLD_RE.sub(r"<strong>\1</strong>", text)
-    text = ITALIC_RE.sub(r"<em>\1</em>", text)
-    # strikethrough
-    text = STRIKE_RE.sub(r"<del>\1</del>", text)
-
-    return text
+    out = []
+    i = 0
+    start = 0
+    n = len(text)
+    memo = {}  # _find results for this text
+    while i < n:
+        m = _INLINE_START_RE.search(text, i)
+        if not m:
+            break
+        i = m.start()
+        hit = _INLINE_SCANNERS[text[i]](text, i, memo)
+        if hit is None:
+            i += 1
+            continue
+        frag, end = hit
+        out.append(text[start:i])
+        out.append(frag)
+        i = start = end
+    if not out:
+        return text
+    out.append(text[start:])
+    return "".join(out)
 
 # Table parsing
 def parse_table(lines):
@@ -106,10 +209,61 @@ def parse_table(lines):
 
     return html
 
+# List tags, interned and shared instead of rebuilt per item with f-strings
+_LIST_OPEN_TAGS = {name: sys.intern(f"<{name}>") for name in ("ul", "ol")}
+_LIST_CLOSE_TAGS = {name: sys.intern(f"\n</{name}>") for name in ("ul", "ol")}
+
+# List item matching: (list_type, indent, content) or (None, None, None)
+def _list_match(l):
+    m_ul = UL_ITEM_RE.match(l)
+    m_ol = None if m_ul else OL_ITEM_RE.match(l)
+    if not (m_ul or m_ol):
+        return (None, None, None)
+    # leading whitespace width, tabs counted as 4 columns
+    l_expanded = l.expandtabs(4)
+    indent = len(l_expanded) - len(l_expanded.lstrip())
+    if m_ul:
+        return ("ul", indent, m_ul.group(1).strip())
+    return ("ol", indent, m_ol.group(2).strip())
+
+# Meta description from a rendered paragraph (tags stripped, max 160 chars)
+def _meta_from_html(parsed: str) -> str:
+    clean = html.unescape(TAG_RE.sub("", parsed))
+    return (clean[:157] + "...") if len(clean) > 160 else clean
+
+# cmark-gfm fast path: same result dict, title/meta taken from the rendered HTML.
+# Only top-level headings and paragraphs count (not ones inside a blockquote or
+# list item), as in md_to_html. Unlike md_to_html, the title has its inline
+# markup stripped ("# Hello *world*" -> "Hello world", not "Hello *world*").
+def _cmark_md_to_html(md: str) -> dict:
+    body = cmarkgfm.github_flavored_markdown_to_html(md).rstrip("\n")
+    title: Optional[str] = None
+    meta_desc: Optional[str] = None
+    depth = 0  # open blockquote/li elements
+    for m in HTML_BLOCK_RE.finditer(body):
+        tag = m.group(2)
+        if tag is None:
+            depth += -1 if m.group(1) else 1
+        elif depth:
+            continue
+        elif tag == "p":
+            if meta_desc is None:
+                meta_desc = _meta_from_html(m.group(3).strip())
+        elif title is None:
+            title = html.unescape(TAG_RE.sub("", m.group(3))).strip()
+        if title is not None and meta_desc is not None:
+            break
+    return {"title": title or "Lesson", "meta": meta_desc or "", "body": body}
+
 # Main markdown to HTML conversion function
 def md_to_html(md: str) -> dict:
-    
+    if USE_CMARK:
+        return _cmark_md_to_html(md)
+
     lines = md.splitlines()
+    n = len(lines)
+    # first non-space character of every line, computed once ("" = blank)
+    firsts = [l.lstrip()[:1] for l in lines]
     i = 0
     html_lines = []
     title: Optional[str] = None
@@ -119,12 +273,14 @@ def md_to_html(md: str) -> dict:
     code_lang = ""
     code_lines = []
 
-    while i < len(lines):
+    while i < n:
         raw = lines[i]
         line = raw.rstrip()
+        # first non-space character decides which block regexes are worth trying
+        c0 = firsts[i]
 
         # fenced code block start/end
-        fence = FENCE_RE.match(line)
+        fence = FENCE_RE.match(line) if c0 == "`" else None
         if fence:
             if not inside_code:
                 inside_code = True
@@ -133,7 +289,7 @@ def md_to_html(md: str) -> dict:
             else:
                 # close
                 inside_code = False
-                code_html = "\n".join(escape_html(l) for l in code_lines)
+                code_html = escape_html("\n".join(code_lines))
                 lang_class = (
                     f' class="language-{escape_html(code_lang)}"' if code_lang else ""
                 )
@@ -146,12 +302,12 @@ def md_to_html(md: str) -> dict:
             i += 1
             continue
 
-        if not line.strip():
+        if not c0:
             i += 1
             continue
 
         # heading
-        m_h = HEADING_RE.match(line)
+        m_h = HEADING_RE.match(line) if c0 == "#" else None
         if m_h:
             level = len(m_h.group(1))
             text = m_h.group(2).strip()
@@ -163,60 +319,53 @@ def md_to_html(md: str) -> dict:
             continue
         
         # lists (supports nested ordered and unordered by indentation)
-        if UL_ITEM_RE.match(line) or OL_ITEM_RE.match(line):
-            def _list_match(l):
-                m_ul = UL_ITEM_RE.match(l)
-                m_ol = OL_ITEM_RE.match(l)
-                if m_ul:
-                    indent = len(re.match(r"^(\s*)", l).group(1).expandtabs(4))
-                    return ("ul", indent, m_ul.group(1).strip())
-                if m_ol:
-                    indent = len(re.match(r"^(\s*)", l).group(1).expandtabs(4))
-                    return ("ol", indent, m_ol.group(2).strip())
-                return (None, None, None)
-
+        if (c0 in "-+*" and UL_ITEM_RE.match(line)) or (
+            c0.isdigit() and OL_ITEM_RE.match(line)
+        ):
             stack = []  # tuples of (indent, list_type)
-            
+            # fragments for this list block; appended, never rewritten
+            frags = []
+
             # helper to close last <li> if needed
             def close_inline_li():
-                if html_lines and html_lines[-1].endswith("</li>") is False:
-                    html_lines[-1] = html_lines[-1].rstrip() + "</li>"
+                if frags and not frags[-1].endswith("</li>"):
+                    frags.append("</li>")
 
-            while i < len(lines):
-                l = lines[i]
-                if not (UL_ITEM_RE.match(l) or OL_ITEM_RE.match(l)):
-                    break
-
-                list_type, indent, content = _list_match(l)
+            while i < n:
+                list_type, indent, content = _list_match(lines[i])
                 if list_type is None:
                     break
 
                 if not stack:
-                    html_lines.append(f"<{list_type}>")
+                    frags.append(_LIST_OPEN_TAGS[list_type])
                     stack.append((indent, list_type))
-                    html_lines.append(f"<li>{inline_parse(escape_html(content))}")
+                    frags.append(f"\n<li>{inline_parse(escape_html(content))}")
                 else:
                     top_indent, top_type = stack[-1]
 
                     if indent > top_indent:
                         # nested list inside the current <li>
-                        html_lines[-1] = html_lines[-1].rstrip() + f"<{list_type}>"
+                        frags.append(_LIST_OPEN_TAGS[list_type])
                         stack.append((indent, list_type))
-                        html_lines.append(f"<li>{inline_parse(escape_html(content))}")
+                        frags.append(f"\n<li>{inline_parse(escape_html(content))}")
 
                     elif indent == top_indent:
                         # same level list item
                         close_inline_li()
-                        html_lines.append(f"<li>{inline_parse(escape_html(content))}")
+                        frags.append(f"\n<li>{inline_parse(escape_html(content))}")
 
                     else:
-                        # dedent (close inner lists first)
+                        # dedent (close inner lists and the <li> holding each);
+                        # the outermost list stays open and a shallower item
+                        # becomes its sibling at the new, smaller indent
                         close_inline_li()
-                        while stack and stack[-1][0] > indent:
+                        while len(stack) > 1 and stack[-1][0] > indent:
                             _, ttype = stack.pop()
-                            html_lines.append(f"</{ttype}>")
-                        close_inline_li()
-                        html_lines.append(f"<li>{inline_parse(escape_html(content))}")
+                            frags.append(_LIST_CLOSE_TAGS[ttype])
+                            close_inline_li()
+                        if stack[-1][0] > indent:
+                            stack[-1] = (indent, stack[-1][1])
+                        frags.append(f"\n<li>{inline_parse(escape_html(content))}")
 
                 i += 1
 
@@ -224,25 +373,31 @@ def md_to_html(md: str) -> dict:
             close_inline_li()
             while stack:
                 _, ttype = stack.pop()
-                html_lines.append(f"</{ttype}>")
+                frags.append(_LIST_CLOSE_TAGS[ttype])
+                if stack:
+                    close_inline_li()
+            html_lines.append("".join(frags))
             continue
 
 
         # table
-        elif re.match(r"^\s*\|.+\|\s*$", line):
+        elif c0 == "|" and TABLE_ROW_RE.match(line):
             table_lines = [line]
             i += 1
-            while i < len(lines) and re.match(r"^\s*\|.+\|\s*$", lines[i]):
+            while i < n and firsts[i] == "|" and TABLE_ROW_RE.match(lines[i]):
                 table_lines.append(lines[i])
                 i += 1
             html_lines.append(parse_table(table_lines))
             continue
 
         # blockquote
-        if BLOCKQUOTE_RE.match(line):
+        if c0 == ">" and BLOCKQUOTE_RE.match(line):
             items = []
-            while i < len(lines) and BLOCKQUOTE_RE.match(lines[i].rstrip()):
-                m2 = BLOCKQUOTE_RE.match(lines[i].rstrip())
+            while (
+                i < n
+                and firsts[i] == ">"
+                and (m2 := BLOCKQUOTE_RE.match(lines[i].rstrip()))
+            ):
                 items.append(inline_parse(escape_html(m2.group(1).strip())))
                 i += 1
             block = " ".join(items)
@@ -250,7 +405,7 @@ def md_to_html(md: str) -> dict:
             continue
 
         # horizontal rule
-        if HR_RE.match(line):
+        if c0 in "-*_" and HR_RE.match(line):
             html_lines.append("<hr>")
             i += 1
             continue
@@ -259,35 +414,34 @@ def md_to_html(md: str) -> dict:
         # paragraph collect (preserve trailing spaces for double-space line breaks)
         para_lines = [raw]  # use raw so we keep trailing spaces
         i += 1
-        while (
-            i < len(lines)
-            and lines[i].strip()
-            and not HEADING_RE.match(lines[i])
-            and not UL_ITEM_RE.match(lines[i])
-            and not OL_ITEM_RE.match(lines[i])
-            and not FENCE_RE.match(lines[i])
-        ):
+        while i < n and firsts[i]:
+            f = firsts[i]
+            if (f in "#-+*`" or f.isdigit()) and PARA_TERM_RE.match(lines[i]):
+                break
             para_lines.append(lines[i])
             i += 1
 
         # build paragraph: double-space at end -> <br>, otherwise join with single space
-        parts = []
-        for idx, pl in enumerate(para_lines):
-            pl = pl.rstrip("\n")
-            if pl.endswith("  "):  # two spaces at EOL => explicit line break
-                content = pl[:-2]
-                parts.append(inline_parse(escape_html(content)))
-                parts.append("<br>")
-            else:
-                parts.append(inline_parse(escape_html(pl)))
-                if idx != len(para_lines) - 1:
-                    parts.append(" ")
+        if not any(pl.endswith("  ") for pl in para_lines):
+            # no explicit line breaks: parse the whole paragraph in one go
+            joined = " ".join(pl.rstrip() for pl in para_lines)
+            parsed = inline_parse(escape_html(joined)).strip()
+        else:
+            parts = []
+            for idx, pl in enumerate(para_lines):
+                if pl.endswith("  "):  # two spaces at EOL => explicit line break
+                    content = pl[:-2]
+                    parts.append(inline_parse(escape_html(content)))
+                    parts.append("<br>")
+                else:
+                    parts.append(inline_parse(escape_html(pl)))
+                    if idx != len(para_lines) - 1:
+                        parts.append(" ")
 
-        parsed = "".join(parts).strip()
+            parsed = "".join(parts).strip()
         # first paragraph as meta description if no heading found
         if not meta_desc:
-            clean = html.unescape(re.sub(r"<.*?>", "", parsed))
-            meta_desc = (clean[:157] + "...") if len(clean) > 160 else clean
+            meta_desc = _meta_from_html(parsed)
         html_lines.append(f"<p>{parsed}</p>")
 
     
@@ -308,11 +462,8 @@ def render_full_html(parsed: dict, css_href: str = None, canonical: str = None)
         f'<link rel="canonical" href="{escape_html(canonical)}">' if canonical else ""
     )
 
-    # Open Graph and Twitter card minimal set for better SEO sharing
-    og_title = title
-    og_desc = meta
-    og_type = "article"
-    # Full HTML document
+    # Full HTML document; Open Graph and Twitter card minimal set for better
+    # SEO sharing (og:title / og:description reuse the escaped title and meta)
     html_doc = f"""<!doctype html>
 <html lang="en">
 
@@ -324,9 +475,9 @@ def render_full_html(parsed: dict, css_href: str = None, canonical: str = None)
 <meta name="robots" content="index, follow">
 {canonical_tag}
 {css_link}
-<meta property="og:title" content="{og_title}">
-<meta property="og:description" content="{og_desc}">
-<meta property="og:type" content="{og_type}">
+<meta property="og:title" content="{title}">
+<meta property="og:description" content="{meta}">
+<meta property="og:type" content="article">
 <meta name="twitter:card" content="summary">
 </head>
 
@@ -339,6 +490,11 @@ def render_full_html(parsed: dict, css_href: str = None, canonical: str = None)
 </html>"""
     return html_doc
 
+# Cached conversion for the web form (repeated submits of the same text)
+@lru_cache(maxsize=128)
+def _cached_convert(md: str) -> str:
+    return render_full_html(md_to_html(md))
+
 # File conversion helper
 def convert_file(
     input_path: Path, output_path: Path, css_href: str = None, canonical: str = None
@@ -350,36 +506,14 @@ def convert_file(
     output_path.write_text(html_out, encoding="utf-8")
     print(f"Wrote {output_path}")
 
+# Batch worker: one (input, output, css_href, canonical) task per process call
+def _convert_one(task):
+    mdfile, outpath, css_href, canonical = task
+    convert_file(mdfile, outpath, css_href=css_href, canonical=canonical)
 
-# CLI runner
-if __name__ == "__main__":
-    p = argparse.ArgumentParser(
-        description="Markdown to HTML converter with CLI and simple web form"
-    )
-    p.add_argument("-i", "--input", help="Input markdown file")
-    p.add_argument("-o", "--output", help="Output html file")
-    p.add_argument("-d", "--indir", help="Input directory (convert all .md)")
-    p.add_argument("-D", "--outdir", help="Output directory")
-    p.add_argument("--css", help="Optional CSS href to include in generated HTML")
-    p.add_argument("--canonical", help="Optional canonical URL for SEO")
-    p.add_argument(
-        "--stdout",
-        action="store_true",
-        help="Write HTML to stdout (read stdin as markdown if no input file)",
-    )
-    p.add_argument(
-        "--serve", action="store_true", help="Run lightweight web form (requires Flask)"
-    )
-    args = p.parse_args()
-    
-    # Web form mode
-    if args.serve:
-        if Flask is None:
-            print("Flask not installed. Install with: pip install flask")
-        else:
-            app = Flask(__name__)
 
-            FORM = """<!doctype html>
+# Web form page (Jinja template, compiled on the first web request)
+FORM = """<!doctype html>
 <html lang="en">
 
 <head>
@@ -633,31 +767,78 @@ if __name__ == "__main__":
 
 </html>"""
 
-            # store last HTML for /raw endpoint
-            last_html = None
-            
-            # main route
-            @app.route("/", methods=["GET", "POST"])
-            def index():
-                global last_html
-                md = ""
-                html_out = ""
-                if request.method == "POST":
-                    md = request.form.get("md", "")
-                    parsed = md_to_html(md)
-                    html_out = render_full_html(parsed)
-                    last_html = html_out
-                return render_template_string(FORM, md=md, html_out=html_out)
-            
-            # raw HTML route
-            @app.route("/raw")
-            def raw():
-                return (
-                    (last_html or ""),
-                    200,
-                    {"Content-Type": "text/html; charset=utf-8"},
-                )
+# compiled FORM template, built lazily so CLI runs and batch workers skip it
+FORM_TMPL = None
+
+# store last HTML for /raw endpoint
+last_html = None
+
+# Flask app (only when Flask is installed)
+if Flask is not None:
+    app = Flask(__name__)
+
+    # compile the form template once, on first use, instead of on every request
+    def _form_template():
+        global FORM_TMPL
+        if FORM_TMPL is None:
+            FORM_TMPL = app.jinja_env.from_string(FORM)
+        return FORM_TMPL
+
+    # main route
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        global last_html
+        md = ""
+        html_out = ""
+        if request.method == "POST":
+            md = request.form.get("md", "")
+            html_out = _cached_convert(md)
+            last_html = html_out
+        return _form_template().render(md=md, html_out=html_out)
+
+    # raw HTML route
+    @app.route("/raw")
+    def raw():
+        return (
+            (last_html or ""),
+            200,
+            {"Content-Type": "text/html; charset=utf-8"},
+        )
+else:
+    app = None
+
 
+# CLI runner
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(
+        description="Markdown to HTML converter with CLI and simple web form"
+    )
+    p.add_argument("-i", "--input", help="Input markdown file")
+    p.add_argument("-o", "--output", help="Output html file")
+    p.add_argument("-d", "--indir", help="Input directory (convert all .md)")
+    p.add_argument("-D", "--outdir", help="Output directory")
+    p.add_argument("--css", help="Optional CSS href to include in generated HTML")
+    p.add_argument("--canonical", help="Optional canonical URL for SEO")
+    p.add_argument(
+        "--stdout",
+        action="store_true",
+        help="Write HTML to stdout (read stdin as markdown if no input file)",
+    )
+    p.add_argument(
+        "--force",
+        action="store_true",
+        help="Batch mode: reconvert files even if the HTML is up to date",
+    )
+    p.add_argument(
+        "--serve", action="store_true", help="Run lightweight web form (requires Flask)"
+    )
+    args = p.parse_args()
+    
+    # Web form mode
+    if args.serve:
+        if Flask is None:
+            print("Flask not installed. Install with: pip install flask")
+        else:
             print("Starting web form at http://127.0.0.1:5000")
             app.run()
         raise SystemExit(0)
@@ -673,13 +854,27 @@ if __name__ == "__main__":
     elif args.indir and args.outdir:
         in_dir = Path(args.indir)
         out_dir = Path(args.outdir)
+        tasks = []
         for mdfile in in_dir.glob("*.md"):
             outpath = out_dir / (mdfile.stem + ".html")
-            convert_file(mdfile, outpath, css_href=args.css, canonical=args.canonical)
+            # skip files whose output is newer than the markdown source
+            if (
+                not args.force
+                and outpath.exists()
+                and outpath.stat().st_mtime >= mdfile.stat().st_mtime
+            ):
+                print(f"Up to date {outpath}")
+                continue
+            tasks.append((mdfile, outpath, args.css, args.canonical))
+        # files are independent and conversion is CPU-bound, so use processes
+        if len(tasks) > 1:
+            with ProcessPoolExecutor() as ex:
+                list(ex.map(_convert_one, tasks))
+        else:
+            for task in tasks:
+                _convert_one(task)
     else:
         # try stdin
-        import sys
-
         if args.stdout:
             if args.input:
                 md = Path(args.input).read_text(encoding="utf-8")